@@ -39,7 +39,8 @@ def to_json_stat(px):
     id_vars = px['METADATA']['STUB']
     id_vars.extend(px['METADATA']['HEADING'])
     value_vars = ['DATA']
-    df = px['DATA']
+    # dimension columns are categorical; sort them by label, not by code
+    df = px['DATA'].astype({id_var: object for id_var in id_vars})
     df = df.melt(
         id_vars=id_vars,
         value_vars=value_vars,
@@ -18,13 +18,18 @@ Example:
 
 """
 
-import itertools
 import logging
+import os
 import re
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
+from functools import lru_cache
+from multiprocessing import get_context
 
-from numpy import nan
+from numpy import (arange, asarray, min_scalar_type, nan, prod, repeat,
+                   tile)
 
-from pandas import DataFrame, Series
+from pandas import Categorical, DataFrame, RangeIndex, Series
 
 import requests
 
@@ -32,6 +37,22 @@ import requests
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# url schemes accepted by the validation regex below
+_URL_SCHEMES = ('http://', 'https://', 'ftp://', 'ftps://')
+
+# django url validation regex:
+_URL_RE = re.compile(r'^(?:http|ftp)s?://'  # http:// or https://
+                     # domain...
+                     r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+'
+                     r'(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
+                     r'localhost|'  # localhost...
+                     r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+                     r'(?::\d+)?'  # optional port
+                     r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+# new line characters to blank translation table
+_NL_TABLE = str.maketrans({'\n': ' ', '\r': ' '})
+
 
 def uri_type(uri):
     """Determine the type of URI.
@@ -47,16 +68,8 @@ def uri_type(uri):
     """
     uri_type_result = 'FILE'
 
-    # django url validation regex:
-    regex = re.compile(r'^(?:http|ftp)s?://'  # http:// or https://
-                       # domain...
-                       r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+'
-                       r'(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|'
-                       r'localhost|'  # localhost...
-                       r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-                       r'(?::\d+)?'  # optional port
-                       r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    if re.match(regex, uri):
+    # cheap scheme check first, so file names never reach the regex
+    if uri[:8].lower().startswith(_URL_SCHEMES) and _URL_RE.match(uri):
         uri_type_result = 'URL'
 
     return uri_type_result
@@ -78,11 +91,10 @@ def read(uri, encoding, timeout=10):
 
     if uri_type(uri) == 'URL':
         try:
-            response = requests.get(uri, stream=True, timeout=timeout)
-            response.raise_for_status()
-            response.encoding = encoding
-            raw_pcaxis = response.text
-            response.close()
+            with requests.get(uri, timeout=timeout) as response:
+                response.raise_for_status()
+                response.encoding = encoding
+                raw_pcaxis = response.text
         except requests.exceptions.ConnectTimeout as connect_timeout:
             logger.error('ConnectionTimeout = %s', str(connect_timeout))
             raise
@@ -103,9 +115,8 @@ def read(uri, encoding, timeout=10):
             logger.error('Generic exception: %s', traceback.format_exc())
             raise
     else:  # file parsing
-        file_object = open(uri, encoding=encoding)
-        raw_pcaxis = file_object.read()
-        file_object.close()
+        with open(uri, encoding=encoding) as file_object:
+            raw_pcaxis = file_object.read()
 
     return raw_pcaxis
 
@@ -122,23 +133,23 @@ def metadata_extract(pc_axis):
         data (string): data values.
 
     """
-    # replace new line characters with blank
-    pc_axis = pc_axis.replace('\n', ' ').replace('\r', ' ')
-
     # split file into metadata and data sections
     metadata, data = pc_axis.split('DATA=')
-    # meta: list of strings that conforms to pattern ATTRIBUTE=VALUES
-    metadata_attributes = split_ignore_quotation_marks(metadata,';', final=True)
+    # replace new line characters with blank; data values are split on any
+    # whitespace later on, so the (larger) data section is left untouched
+    metadata = metadata.translate(_NL_TABLE)
+    # meta: list of strings that conforms to pattern ATTRIBUTE=VALUES,
+    # without leading and trailing blanks and semicolons
+    metadata_attributes = [
+        item.strip().strip(';') for item in
+        split_ignore_quotation_marks(metadata, ';', final=True)]
     #metadata_attributes = re.findall('([^=]+=[^=]+)(?:;|$)', metadata)
 
-    # remove all semicolons
-    data = data.replace(';', '')
-    # remove trailing blanks
-    data = data.strip()
-
-    # 
-    for i, item in enumerate(metadata_attributes):
-        metadata_attributes[i] = item.strip().rstrip(';')
+    # remove the trailing semicolon and blanks, only copying the data
+    # section again if there are more semicolons to remove
+    data = data.strip().rstrip(';').rstrip()
+    if ';' in data:
+        data = data.replace(';', '').strip()
 
     return metadata_attributes, data
 
@@ -177,6 +188,61 @@ def split_ignore_quotation_marks(input, separator, final=False):
     return input
 
 
+def split_quoted_values(values):
+    """Split values delimited by double quotes into a list.
+
+    Scans the input once, without regex backtracking on long value lists.
+
+    Args:
+        values (string): metadata values, e.g. '"value1","value2"'
+
+    Returns:
+        list: ['value1', 'value2', ...] without leading and trailing blanks;
+              empty values are skipped.
+    """
+    result = []
+    index_from = 0
+
+    while True:
+        quotation_mark_start = values.find('"', index_from)
+        if quotation_mark_start < 0:
+            break
+        quotation_mark_end = values.find('"', quotation_mark_start + 1)
+        if quotation_mark_end < 0:
+            break
+        value = values[quotation_mark_start + 1:quotation_mark_end].strip(' ')
+        if value:
+            result.append(value)
+        index_from = quotation_mark_end + 1
+    return result
+
+
+def split_metadata_element(element):
+    """Split a metadata element into its name and its list of values.
+
+    Args:
+        element (string): pair ATTRIBUTE=VALUES
+
+    Returns:
+        name (string): attribute name, without double quotes.
+        values (list of string): ['value1', 'value2', ... ]
+
+    """
+    # split at the first '=' outside double quotes; values may contain
+    # further '=' characters
+    name, _, values = element.partition('=')
+    while name.count('"') % 2 and values:
+        name_tail, _, values = values.partition('=')
+        name = name + '=' + name_tail
+    name = name.replace('"', '')
+    # remove leading and trailing blanks from element names
+    name = name.replace('( ', '(')
+    name = name.replace(' )', ')')
+    # split values delimited by double quotes into list
+    # additionally strip leading and trailing blanks
+    return name, split_quoted_values(values)
+
+
 def metadata_split_to_dict(metadata_elements):
     """Split the list of metadata elements into a multi-valued keys dict.
 
@@ -187,18 +253,8 @@ def metadata_split_to_dict(metadata_elements):
         metadata (dictionary): {'attribute1': ['value1', 'value2', ... ], ...}
 
     """
-    metadata = {}
-
-    for element in metadata_elements:
-        name, values = split_ignore_quotation_marks(element, '=', final=False)
-        name = name.replace('"', '')
-        # remove leading and trailing blanks from element names
-        name = name.replace('( ', '(')
-        name = name.replace(' )', ')')
-        # split values delimited by double quotes into list
-        # additionally strip leading and trailing blanks
-        metadata[name] = re.findall('"[ ]*(.+?)[ ]*"+?', values)
-    return metadata
+    return {name: values for name, values
+            in map(split_metadata_element, metadata_elements)}
 
 
 def get_dimensions(metadata):
@@ -212,33 +268,45 @@ def get_dimensions(metadata):
         dimension_members (list)
 
     """
-    dimension_names = []
-    dimension_members = []
-
-    # add STUB and HEADING elements to a list of dimension names
-    # add VALUES of STUB and HEADING to a list of dimension members
-    stubs = metadata['STUB']
-    for stub in stubs:
-        dimension_names.append(stub)
-        stub_values = []
-        raw_stub_values = metadata['VALUES(' + stub + ')']
-        for value in raw_stub_values:
-            stub_values.append(value)
-        dimension_members.append(stub_values)
-
-    # add HEADING values to the list of dimension members
-    headings = metadata['HEADING']
-    for heading in headings:
-        dimension_names.append(heading)
-        heading_values = []
-        raw_heading_values = metadata['VALUES(' + heading + ')']
-        for value in raw_heading_values:
-            heading_values.append(value)
-        dimension_members.append(heading_values)
+    # STUB and HEADING elements are the dimension names, and their VALUES
+    # are the dimension members
+    dimension_names = metadata['STUB'] + metadata['HEADING']
+    dimension_members = [metadata['VALUES(' + name + ')']
+                         for name in dimension_names]
 
     return dimension_names, dimension_members
 
 
+def clean_data_values(data_values, null_values, sd_values):
+    """Replace null and statistical disclosure values in the data series.
+
+       Null values are replaced by a blank and statistical disclosure values
+       by NaN. Patterns are evaluated once per distinct value instead of once
+       per cell, as data values are highly repetitive.
+
+    Args:
+        data_values(Series): pandas series with the data values column.
+        null_values(str): regex with the pattern for the null values in the px
+                          file.
+        sd_values(str): regex with the pattern for the statistical disclosured
+                        values in the px file.
+    Returns:
+        data_values (Series): cleaned series of data values.
+
+    """
+    null_regex = re.compile(null_values)
+    sd_regex = re.compile(sd_values)
+
+    replacements = {}
+    for value in data_values.unique():
+        if not isinstance(value, str):
+            continue
+        cleaned = null_regex.sub('', value)
+        replacements[value] = nan if sd_regex.search(cleaned) else cleaned
+
+    return data_values.map(replacements)
+
+
 def build_dataframe(dimension_names, dimension_members, data_values,
                     null_values, sd_values):
     """Build a dataframe from dimensions and data.
@@ -257,22 +325,42 @@ def build_dataframe(dimension_names, dimension_members, data_values,
         df (pandas dataframe)
 
     """
-    # cartesian product of dimension members
-    dim_exploded = list(itertools.product(*dimension_members))
+    # cartesian product of dimension members, built column by column: each
+    # member is repeated once per combination of the following dimensions,
+    # and the column is tiled once per combination of the preceding ones.
+    # Columns are categorical, built from the integer codes of the members.
+    # The first dimension is never tiled and the last one never repeated, so
+    # the usual one stub, one heading table needs a single pass per column
+    sizes = [len(members) for members in dimension_members]
+    columns = {}
+    for i, (name, members) in enumerate(zip(dimension_names,
+                                            dimension_members)):
+        # smallest signed integer type for the codes, so that the repeated
+        # and tiled arrays are not built as int64
+        codes = arange(len(members), dtype=min_scalar_type(-len(members)))
+        if i < len(sizes) - 1:
+            codes = repeat(codes, int(prod(sizes[i + 1:])))
+        if i > 0:
+            codes = tile(codes, int(prod(sizes[:i])))
+        if len(set(members)) == len(members):
+            columns[name] = Categorical.from_codes(codes, categories=members)
+        else:
+            # categories must be unique, keep repeated members as objects
+            columns[name] = asarray(members, dtype=object)[codes]
 
-    df = DataFrame(data=dim_exploded, columns=dimension_names)
+    # column of data values, with null values and statistical disclosure
+    # treatment; it is aligned to the index of the dimension columns
+    columns['DATA'] = clean_data_values(data_values, null_values, sd_values)
 
-    # column of data values
-    df['DATA'] = data_values
-    # null values and statistical disclosure treatment
-    df = df.replace({'DATA': {null_values: ''}}, regex=True)
-    df = df.replace({'DATA': {sd_values: nan}}, regex=True)
+    # single constructor call, adopting the prebuilt columns without copies
+    df = DataFrame(data=columns, index=RangeIndex(int(prod(sizes))),
+                   columns=dimension_names + ['DATA'], copy=False)
 
     return df
 
 
 def parse(uri, encoding, timeout=10,
-          null_values=r'^"\."$', sd_values=r'"\.\."'):
+          null_values=r'^"\."$', sd_values=r'"\.\."', cache=False):
     """Extract metadata and data sections from pc-axis.
 
     Args:
@@ -283,6 +371,9 @@ def parse(uri, encoding, timeout=10,
                           file. Defaults to '.'.
         sd_values(str): regex with the pattern for the statistical disclosured
                         values in the px file. Defaults to '..'.
+        cache (bool): reuse the result of a previous parse of the same,
+                      unmodified local file; optional. Up to 32 results are
+                      kept in memory.
 
     Returns:
          pc_axis_dict (dictionary): dictionary of metadata and pandas df.
@@ -292,12 +383,65 @@ def parse(uri, encoding, timeout=10,
     """
     # get file content or URL stream
     try:
+        if cache and uri_type(uri) == 'FILE':
+            # local files are only parsed again when they are modified
+            file_stat = os.stat(uri)
+            parsed_pc_axis = _parse_file(
+                os.path.realpath(uri), encoding, null_values, sd_values,
+                file_stat.st_mtime_ns, file_stat.st_size)
+            # copies, so that changes made by the caller do not reach the cache
+            return {
+                'METADATA': {name: list(values) for name, values
+                             in parsed_pc_axis['METADATA'].items()},
+                'DATA': parsed_pc_axis['DATA'].copy()
+            }
         pc_axis = read(uri, encoding, timeout)
     except ValueError:
         import traceback
         logger.error('Generic exception: %s', traceback.format_exc())
         raise
 
+    return parse_contents(pc_axis, null_values, sd_values)
+
+
+@lru_cache(maxsize=32)
+def _parse_file(path, encoding, null_values, sd_values, mtime, size):
+    """Parse a pc-axis file, caching the result by its modification time.
+
+    Args:
+        path (str): absolute file name
+        encoding (str): charset encoding
+        null_values(str): regex with the pattern for the null values.
+        sd_values(str): regex with the pattern for the statistical disclosured
+                        values.
+        mtime (int): file modification time in nanoseconds; only part of the
+                     cache key.
+        size (int): file size in bytes; only part of the cache key, catches
+                    rewrites within the same modification time.
+
+    Returns:
+         pc_axis_dict (dictionary): see parse; must not be modified.
+
+    """
+    return parse_contents(read(path, encoding), null_values, sd_values)
+
+
+def parse_contents(pc_axis, null_values=r'^"\."$', sd_values=r'"\.\."'):
+    """Extract metadata and data sections from pc-axis file contents.
+
+    Args:
+        pc_axis (str): pc_axis file contents.
+        null_values(str): regex with the pattern for the null values in the px
+                          file. Defaults to '.'.
+        sd_values(str): regex with the pattern for the statistical disclosured
+                        values in the px file. Defaults to '..'.
+
+    Returns:
+         pc_axis_dict (dictionary): dictionary of metadata and pandas df.
+                                    METADATA: dictionary of metadata
+                                    DATA: pandas dataframe
+
+    """
     # metadata and data extraction and cleaning
     metadata_elements, raw_data = metadata_extract(pc_axis)
 
@@ -326,3 +470,43 @@ def parse(uri, encoding, timeout=10,
         'DATA': df
     }
     return parsed_pc_axis
+
+
+def parse_many(uris, encoding, timeout=10,
+               null_values=r'^"\."$', sd_values=r'"\.\."', max_workers=None,
+               max_threads=None):
+    """Extract metadata and data sections from several pc-axis in parallel.
+
+       Files and URLs are read in a thread pool, and their contents are
+       parsed in a process pool as soon as each read completes. Worker
+       processes are spawned rather than forked, as reads are still running
+       in other threads; scripts calling this function need an
+       ``if __name__ == '__main__':`` guard.
+
+    Args:
+        uris (list of str): file names or URLs
+        encoding (str): charset encoding
+        timeout (int): request timeout in seconds; optional
+        null_values(str): regex with the pattern for the null values in the px
+                          file. Defaults to '.'.
+        sd_values(str): regex with the pattern for the statistical disclosured
+                        values in the px file. Defaults to '..'.
+        max_workers (int): maximum number of parsing processes; optional
+        max_threads (int): maximum number of reading threads; optional
+
+    Returns:
+         pc_axis_dicts (dictionary): parsed pc-axis dictionary (see parse)
+                                     for each file name or URL.
+
+    """
+    with ThreadPoolExecutor(max_workers=max_threads) as read_pool, \
+            ProcessPoolExecutor(max_workers=max_workers,
+                                mp_context=get_context('spawn')) as parse_pool:
+        reads = {read_pool.submit(read, uri, encoding, timeout): uri
+                 for uri in uris}
+        parses = {}
+        for future in as_completed(reads):
+            parses[reads[future]] = parse_pool.submit(
+                parse_contents, future.result(), null_values, sd_values)
+
+        return {uri: parses[uri].result() for uri in uris}
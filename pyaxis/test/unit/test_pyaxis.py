@@ -20,6 +20,9 @@ def test_uri_type():
     """uri_type() should be capable of discriminating files and URLs."""
     assert pyaxis.uri_type('2184.px') == 'FILE'
     assert pyaxis.uri_type(data_path + '2184.px') == 'FILE'
+    assert pyaxis.uri_type('HTTPS://www.ine.es/2184.px') == 'URL'
+    assert pyaxis.uri_type('ftp://localhost/2184.px') == 'URL'
+    assert pyaxis.uri_type('http://') == 'FILE'
 
 
 def test_read():
@@ -63,6 +66,14 @@ def test_metadata_split_dict_quotation_marks():
     assert metadata['VALUES(estrato de empleo)'] == ['Total', '>=10 empleados']
 
 
+def test_metadata_split_dict_equal_signs():
+    """Should split at the first equal sign outside quotation marks."""
+    metadata_elements = ['NOTE="a=b", "c = d"', 'VALUES("x=y")="1","2"']
+    metadata = pyaxis.metadata_split_to_dict(metadata_elements)
+    assert metadata['NOTE'] == ['a=b', 'c = d']
+    assert metadata['VALUES(x=y)'] == ['1', '2']
+
+
 def test_split_ignore_quotation_marks():
     """Should ignore the separator if it is between doble quotation marks,
     simple quotation mark is ignored as quotation mark"""
@@ -79,6 +90,15 @@ def test_split_ignore_quotation_marks():
     assert len(result) == 3
 
 
+def test_split_quoted_values():
+    """Should split values between double quotation marks, stripping blanks."""
+    values = '" Total ","Hombres", "Mujeres",\n"a=b;c"'
+    result = pyaxis.split_quoted_values(values)
+    assert result == ['Total', 'Hombres', 'Mujeres', 'a=b;c']
+    assert pyaxis.split_quoted_values('2006') == []
+    assert pyaxis.split_quoted_values('""') == []
+
+
 def test_get_dimensions():
     """Should return two lists (dimension names and members)."""
     pc_axis = pyaxis.read(
@@ -113,10 +133,24 @@ def test_build_dataframe():
         null_values=null_values,
         sd_values=sd_values)
     assert df.shape == (8064, 5)
+    assert df[dimension_names[0]].dtype == 'category'
+    assert df[dimension_names[3]][3] == 'Divorciados/as'
     assert df['DATA'][7] == '28138'
     assert df['DATA'][159] == '422'
 
 
+def test_clean_data_values():
+    """Should blank null values and turn statistical disclosure into NaN."""
+    data_values = Series(['1', '"."', '".."', '1', '"."'])
+    cleaned = pyaxis.clean_data_values(
+        data_values, null_values=r'^"\."$', sd_values=r'"\.\."')
+    assert cleaned[0] == '1'
+    assert cleaned[1] == ''
+    assert isnan(cleaned[2])
+    assert cleaned[3] == '1'
+    assert cleaned[4] == ''
+
+
 def test_parse():
     """Should parse a pc-axis into a dataframe and a metadata dictionary"""
     parsed_pcaxis = pyaxis.parse(
@@ -132,6 +166,33 @@ def test_parse():
         'Extranjero'
 
 
+def test_parse_cache():
+    """Should reuse a parsed file without sharing it with the caller."""
+    uri = data_path + '1001.px'
+    misses = pyaxis._parse_file.cache_info().misses
+    pyaxis.parse(uri, encoding='ISO-8859-15')
+    assert pyaxis._parse_file.cache_info().misses == misses
+    first = pyaxis.parse(uri, encoding='ISO-8859-15', cache=True)
+    first['METADATA']['STUB'].append('Variables')
+    first['DATA']['DATA'] = ''
+    hits = pyaxis._parse_file.cache_info().hits
+    second = pyaxis.parse(uri, encoding='ISO-8859-15', cache=True)
+    assert pyaxis._parse_file.cache_info().hits == hits + 1
+    assert 'Variables' not in second['METADATA']['STUB']
+    assert (second['DATA']['DATA'] != '').any()
+
+
+def test_parse_many():
+    """Should parse several pc-axis into a dictionary keyed by file name."""
+    uris = [data_path + '1001.px', data_path + '14001.px']
+    parsed_pcaxis = pyaxis.parse_many(uris, encoding='ISO-8859-15')
+    assert list(parsed_pcaxis) == uris
+    for uri in uris:
+        expected = pyaxis.parse(uri, encoding='ISO-8859-15')
+        assert parsed_pcaxis[uri]['METADATA'] == expected['METADATA']
+        assert parsed_pcaxis[uri]['DATA'].equals(expected['DATA'])
+
+
 def test_statistical_disclosure():
     """Should parse a pc-axis with statistical disclosure into a dataframe.
 